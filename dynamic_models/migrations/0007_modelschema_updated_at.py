@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-15 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dynamic_models", "0006_alter_fieldschema_id_alter_modelschema_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="modelschema",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -1,13 +1,33 @@
-from django.core.exceptions import FieldDoesNotExist, ValidationError
+import threading
+from collections import OrderedDict
+from functools import cached_property, lru_cache
+
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.signals import post_delete, post_save
 from django.db.utils import DEFAULT_DB_ALIAS
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.module_loading import import_string
 from django.utils.text import slugify
 
 from dynamic_models import compat, config
 from dynamic_models.exceptions import InvalidFieldNameError, NullFieldChangedError
-from dynamic_models.factory import ModelFactory
 from dynamic_models.schema import FieldSchemaEditor, ModelSchemaEditor
-from dynamic_models.utils import ModelRegistry
+from dynamic_models.utils import ModelRegistry, get_model_field, model_is_current
+
+
+_ON_DELETE_MAP = {
+    name: getattr(models, name)
+    for name in ("CASCADE", "PROTECT", "SET_NULL", "SET_DEFAULT", "DO_NOTHING", "SET", "RESTRICT")
+    if hasattr(models, name)
+}
+
+# Generated models shared by all ModelSchema instances in the process, stored as
+# {schema pk: (cache key, model)} with the least recently used schema first.
+_MODEL_CACHE_SIZE = 512
+_model_cache = OrderedDict()
+_model_cache_lock = threading.Lock()
 
 
 class ModelSchema(models.Model):
@@ -15,22 +35,20 @@ class ModelSchema(models.Model):
     db_name = models.CharField(max_length=32, default=DEFAULT_DB_ALIAS)
     managed = models.BooleanField(default=True)
     db_table_name = models.CharField(null=True, max_length=250)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._registry = ModelRegistry(self.app_label)
         self._initial_name = self.name
-        initial_model = self.get_registered_model()
-        self._schema_editor = (
-            ModelSchemaEditor(initial_model=initial_model, db_name=self.db_name)
-            if self.managed
-            else None
-        )
+        self._initial_model = self.get_registered_model()
 
     def save(self, **kwargs):
         super().save(**kwargs)
         if self._schema_editor:
-            self._schema_editor.update_table(self._factory.get_model())
+            model = self._factory.get_model()
+            self._schema_editor.update_table(model)
+            self._set_model_cache(model)
 
         self._initial_name = self.name
 
@@ -38,13 +56,25 @@ class ModelSchema(models.Model):
         if self._schema_editor:
             self._schema_editor.drop_table(self.as_model())
         self._factory.destroy_model()
+        self._expire_model_cache()
         super().delete(**kwargs)
 
     def get_registered_model(self):
         return self._registry.get_model(self.model_name)
 
-    @property
+    @cached_property
+    def _schema_editor(self):
+        # built on first use so that read-only instances never create one
+        return (
+            ModelSchemaEditor(initial_model=self._initial_model, db_name=self.db_name)
+            if self.managed
+            else None
+        )
+
+    @cached_property
     def _factory(self):
+        from dynamic_models.factory import ModelFactory
+
         return ModelFactory(self)
 
     @property
@@ -61,38 +91,72 @@ class ModelSchema(models.Model):
 
     @classmethod
     def get_model_name(cls, name):
-        return name.title().replace(" ", "")
+        return _model_name(name)
 
     @property
     def db_table(self):
         return self.db_table_name if self.db_table_name else self._default_db_table_name()
 
     def _default_db_table_name(self):
-        safe_name = slugify(self.name).replace("-", "_")
-        return f"{self.app_label}_{safe_name}"
+        return _table_name(self.app_label, self.name)
 
     def as_model(self):
-        return self._factory.get_model()
+        """
+        Return the dynamic model, reusing the one generated for this schema's version
+        if it is still current. The version is this instance's `updated_at`, which is
+        bumped whenever a FieldSchema row is saved or deleted, including queryset
+        deletes and `loaddata`. An instance loaded before another process edited the
+        schema keeps getting the model for the version it loaded; reload the schema to
+        pick up such changes. Queryset `update()` and `bulk_create()` send no signals,
+        so field rows must not be changed that way.
+        """
+        key = self._get_model_cache_key()
+        with _model_cache_lock:
+            cached_key, model = _model_cache.get(self.pk, (None, None))
+            if cached_key == key:
+                _model_cache.move_to_end(self.pk)
+        if cached_key != key or not model_is_current(model):
+            model = self._set_model_cache(self._factory.get_model())
+        return model
+
+    def _touch(self):
+        """Mark the schema as changed, e.g. after one of its fields was edited."""
+        self.updated_at = _touch_model_schema(self.pk)
+
+    def _get_model_cache_key(self):
+        return (self.updated_at, self.name, self.db_table)
+
+    def _set_model_cache(self, model):
+        with _model_cache_lock:
+            _model_cache[self.pk] = (self._get_model_cache_key(), model)
+            _model_cache.move_to_end(self.pk)
+            if len(_model_cache) > _MODEL_CACHE_SIZE:
+                _model_cache.popitem(last=False)
+        return model
+
+    def _expire_model_cache(self):
+        with _model_cache_lock:
+            _model_cache.pop(self.pk, None)
 
 
 class FieldKwargsJSON(compat.JSONField):
     description = "A field that handles storing models.Field kwargs as JSON"
 
+    # django.contrib.postgres.fields.JSONField does not implement from_db_value
+    # for some reason. In that version, value is already a dict
+    _HAS_PARENT_FROM_DB = callable(getattr(compat.JSONField, "from_db_value", None))
+
     def to_python(self, value):
         raw_value = super().to_python(value)
         try:
             return self._convert_on_delete_to_function(raw_value)
-        except AttributeError as err:
+        except (AttributeError, ImportError) as err:
             raise ValidationError("Invalid value for 'on_delete'") from err
 
     def from_db_value(self, value, expression, connection):
-        # django.contrib.postgres.fields.JSONField does not implement from_db_value
-        # for some reason. In that version, value is already a dict
-        try:
-            db_value = super().from_db_value(value, expression, connection)
-        except AttributeError:
-            db_value = value
-        return self._convert_on_delete_to_function(db_value)
+        if self._HAS_PARENT_FROM_DB:
+            value = super().from_db_value(value, expression, connection)
+        return self._convert_on_delete_to_function(value)
 
     def get_prep_value(self, value):
         prep_value = self._convert_on_delete_to_string(value)
@@ -103,30 +167,63 @@ class FieldKwargsJSON(compat.JSONField):
             return raw_value
 
         raw_on_delete = raw_value["on_delete"]
-        if isinstance(raw_on_delete, str):
-            raw_value["on_delete"] = getattr(models, raw_on_delete)
+        if not isinstance(raw_on_delete, str):
+            return raw_value
 
-        return raw_value
+        on_delete = _ON_DELETE_MAP.get(raw_on_delete)
+        if on_delete is None:
+            name, _, dotted_path = raw_on_delete.partition(":")
+            if name == "SET" and dotted_path:
+                on_delete = _set_on_delete(dotted_path)
+            else:
+                on_delete = getattr(models, raw_on_delete)
+        return {**raw_value, "on_delete": on_delete}
 
     def _convert_on_delete_to_string(self, raw_value):
         if raw_value is None or "on_delete" not in raw_value:
             return raw_value
 
         raw_on_delete = raw_value["on_delete"]
-        if callable(raw_on_delete):
-            raw_value["on_delete"] = raw_on_delete.__name__
+        if not callable(raw_on_delete):
+            return raw_value
 
-        return raw_value
+        return {**raw_value, "on_delete": self._on_delete_to_string(raw_on_delete)}
+
+    @staticmethod
+    def _on_delete_to_string(on_delete):
+        deconstruct = getattr(on_delete, "deconstruct", None)
+        if deconstruct is None:
+            return on_delete.__name__
+
+        # models.SET(value) carries its argument in deconstruct(); it is stored as
+        # "SET:<dotted.path>" so that it can be imported back
+        (value,) = deconstruct()[1]
+        dotted_path = f"{getattr(value, '__module__', None)}.{getattr(value, '__qualname__', None)}"
+        try:
+            importable = import_string(dotted_path) is value
+        except ImportError:
+            importable = False
+        if not importable:
+            raise ValidationError("'on_delete' SET() value must be an importable callable")
+        return f"SET:{dotted_path}"
+
+
+class FieldSchemaQuerySet(models.QuerySet):
+    def with_model_schema(self):
+        """Load each field's model_schema in the same query, for rows loaded without it."""
+        return self.select_related("model_schema")
 
 
 class FieldSchema(models.Model):
-    _PROHIBITED_NAMES = ("__module__", "_declared")
+    _PROHIBITED_NAMES = frozenset(("__module__", "_declared"))
 
     name = models.CharField(max_length=63)
     model_schema = models.ForeignKey(ModelSchema, on_delete=models.CASCADE, related_name="fields")
     class_name = models.TextField()
     kwargs = FieldKwargsJSON(default=dict)
 
+    objects = FieldSchemaQuerySet.as_manager()
+
     class Meta:
         unique_together = (("name", "model_schema"),)
 
@@ -134,49 +231,87 @@ class FieldSchema(models.Model):
         super().__init__(*args, **kwargs)
         self._initial_name = self.name
         self._initial_null = self.null
-        self._initial_field = self.get_registered_model_field()
-        self._schema_editor = (
-            FieldSchemaEditor(initial_field=self._initial_field, db_name=self.model_schema.db_name)
-            if self.model_schema.managed
-            else None
-        )
+        self._initial_state = self._get_schema_state()
 
     def save(self, **kwargs):
+        if self._is_unchanged():
+            # nothing that defines the column changed, so there is nothing to validate or alter
+            super().save(**kwargs)
+            return
+
         self.validate()
+        schema_editor = self._schema_editor
         super().save(**kwargs)
         model, field = self._get_model_with_field()
-        if self._schema_editor:
-            self._schema_editor.update_column(model, field)
+        if schema_editor:
+            schema_editor.update_column(model, field)
+
+        self._initial_state = self._get_schema_state()
 
     def delete(self, **kwargs):
+        schema_editor = self._schema_editor
         model, field = self._get_model_with_field()
-        if self._schema_editor:
-            self._schema_editor.drop_column(model, field)
+        if schema_editor:
+            schema_editor.drop_column(model, field)
         super().delete(**kwargs)
 
-    def validate(self):
-        if self._initial_null and not self.null:
-            raise NullFieldChangedError(f"Cannot change NULL field '{self.name}' to NOT NULL")
+    @classmethod
+    def bulk_init(cls, fields, model_schema):
+        """
+        Attach `model_schema` to each of `fields` and resolve their registered model
+        fields from a single lookup table.
+        """
+        latest_model = model_schema.get_registered_model()
+        for field in fields:
+            field.model_schema = model_schema
+            field._initial_field = (
+                get_model_field(latest_model, field._initial_name) if latest_model else None
+            )
+        return fields
+
+    @classmethod
+    def bulk_create_with_schema(cls, fields, model_schema):
+        """
+        Create `fields` on `model_schema` with a single insert, a single model rebuild
+        and a single schema editor, instead of a full `save()` per field.
+        """
+        fields = cls.bulk_init(fields, model_schema)
+        for field in fields:
+            field.validate()
+        fields = cls.objects.bulk_create(fields)
+
+        model_schema._touch()
+        model = model_schema.as_model()
+        changes = [
+            (field._initial_field, get_model_field(model, field.db_column)) for field in fields
+        ]
+        if model_schema.managed:
+            FieldSchemaEditor(db_name=model_schema.db_name).batch_update_columns(model, changes)
+
+        for field, (_, new_field) in zip(fields, changes):
+            if field._schema_editor:
+                field._schema_editor.initial_field = new_field
+            field._initial_state = field._get_schema_state()
+        return fields
 
+    def validate(self):
         if self.name in self.get_prohibited_names():
             raise InvalidFieldNameError(f"{self.name} is not a valid field name")
 
+        if self._initial_null and not self.null:
+            raise NullFieldChangedError(f"Cannot change NULL field '{self.name}' to NOT NULL")
+
     def get_registered_model_field(self):
-        latest_model = self.model_schema.get_registered_model()
-        if latest_model and self.name:
-            try:
-                return latest_model._meta.get_field(self.name)
-            except FieldDoesNotExist:
-                pass
+        return self._get_registered_field(self.name)
 
     @classmethod
     def get_prohibited_names(cls):
-        # TODO: return prohbited names based on backend
+        # TODO: return prohbited names based on backend, e.g. `cls._PROHIBITED_NAMES | {...}`
         return cls._PROHIBITED_NAMES
 
     @property
     def db_column(self):
-        return slugify(self.name).replace("-", "_")
+        return _slug_underscore(self.name)
 
     @property
     def null(self):
@@ -189,10 +324,82 @@ class FieldSchema(models.Model):
     def get_options(self):
         return self.kwargs.copy()
 
+    @cached_property
+    def _initial_field(self):
+        return self._get_registered_field(self._initial_name)
+
+    @cached_property
+    def _schema_editor(self):
+        # Resolved on first use, not in __init__: rows loaded from the db only get
+        # model_schema attached afterwards. save() and delete() resolve it before
+        # the model is regenerated.
+        return (
+            FieldSchemaEditor(initial_field=self._initial_field, db_name=self.model_schema.db_name)
+            if self.model_schema.managed
+            else None
+        )
+
+    def _get_schema_state(self):
+        return (self.name, self.class_name, self.model_schema_id)
+
+    def _is_unchanged(self):
+        if self._state.adding or self._get_schema_state() != self._initial_state:
+            return False
+
+        # kwargs may be edited in place, so compare them with the stored row at save time
+        # instead of snapshotting them for every loaded row
+        stored_kwargs = (
+            FieldSchema.objects.using(self._state.db)
+            .filter(pk=self.pk)
+            .values_list("kwargs", flat=True)
+            .first()
+        )
+        return stored_kwargs == self.kwargs
+
+    def _get_registered_field(self, name):
+        latest_model = self.model_schema.get_registered_model()
+        if latest_model and name:
+            return get_model_field(latest_model, name)
+
     def _get_model_with_field(self):
         model = self.model_schema.as_model()
-        try:
-            field = model._meta.get_field(self.db_column)
-        except FieldDoesNotExist:
-            field = None
-        return model, field
+        return model, get_model_field(model, self.db_column)
+
+
+@receiver(post_save, sender=FieldSchema)
+@receiver(post_delete, sender=FieldSchema)
+def _field_schema_changed(sender, instance, **kwargs):
+    # Signals also cover queryset deletes and loaddata, which bypass FieldSchema.save/delete
+    if FieldSchema.model_schema.is_cached(instance):
+        instance.model_schema._touch()
+    else:
+        _touch_model_schema(instance.model_schema_id)
+
+
+def _touch_model_schema(schema_pk):
+    """Bump the schema's version and drop its shared model; return the new version."""
+    updated_at = timezone.now()
+    ModelSchema.objects.filter(pk=schema_pk).update(updated_at=updated_at)
+    with _model_cache_lock:
+        _model_cache.pop(schema_pk, None)
+    return updated_at
+
+
+@lru_cache(maxsize=1024)
+def _model_name(name):
+    return name.title().replace(" ", "")
+
+
+@lru_cache(maxsize=1024)
+def _slug_underscore(name):
+    return slugify(name).replace("-", "_")
+
+
+@lru_cache(maxsize=1024)
+def _table_name(app_label, name):
+    return f"{app_label}_{_slug_underscore(name)}"
+
+
+@lru_cache(maxsize=128)
+def _set_on_delete(dotted_path):
+    return models.SET(import_string(dotted_path))
@@ -1,7 +1,10 @@
 """Wrapper functions for performing runtime schema changes."""
-from django.db import connections
+from contextlib import contextmanager
+
 from django.db.utils import DEFAULT_DB_ALIAS, ProgrammingError
 
+from dynamic_models.utils import clear_introspection_cache, with_connection
+
 
 class ModelSchemaEditor:
     def __init__(self, initial_model=None, db_name=DEFAULT_DB_ALIAS):
@@ -17,7 +20,7 @@ class ModelSchemaEditor:
 
     def create_table(self, new_model):
         try:
-            with connections[self.db_name].schema_editor() as editor:
+            with _schema_editor(self.db_name) as editor:
                 editor.create_model(new_model)
         except ProgrammingError:
             # TODO: I couldn't figure out why sometimes despite the
@@ -29,11 +32,11 @@ class ModelSchemaEditor:
     def alter_table(self, new_model):
         old_name = self.initial_model._meta.db_table
         new_name = new_model._meta.db_table
-        with connections[self.db_name].schema_editor() as editor:
+        with _schema_editor(self.db_name) as editor:
             editor.alter_db_table(new_model, old_name, new_name)
 
     def drop_table(self, model):
-        with connections[self.db_name].schema_editor() as editor:
+        with _schema_editor(self.db_name) as editor:
             editor.delete_model(model)
 
 
@@ -49,14 +52,32 @@ class FieldSchemaEditor:
             self.add_column(model, new_field)
         self.initial_field = new_field
 
+    def batch_update_columns(self, model, changes):
+        """Apply `(initial_field, new_field)` pairs to `model` in a single schema editor."""
+        with _schema_editor(self.db_name) as editor:
+            for initial_field, new_field in changes:
+                if initial_field and initial_field != new_field:
+                    editor.alter_field(model, initial_field, new_field)
+                elif not initial_field:
+                    editor.add_field(model, new_field)
+
     def add_column(self, model, field):
-        with connections[self.db_name].schema_editor() as editor:
+        with _schema_editor(self.db_name) as editor:
             editor.add_field(model, field)
 
     def alter_column(self, model, new_field):
-        with connections[self.db_name].schema_editor() as editor:
+        with _schema_editor(self.db_name) as editor:
             editor.alter_field(model, self.initial_field, new_field)
 
     def drop_column(self, model, field):
-        with connections[self.db_name].schema_editor() as editor:
+        with _schema_editor(self.db_name) as editor:
             editor.remove_field(model, field)
+
+
+@contextmanager
+def _schema_editor(db_name):
+    try:
+        with with_connection(db_name) as conn, conn.schema_editor() as editor:
+            yield editor
+    finally:
+        clear_introspection_cache(db_name)
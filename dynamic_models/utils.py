@@ -1,56 +1,174 @@
+import threading
 from contextlib import contextmanager
+from itertools import chain
+from weakref import WeakKeyDictionary
 
 from django.apps import apps
 from django.core.exceptions import FieldDoesNotExist
-from django.db import connection
+from django.db import connections
+from django.db.utils import DEFAULT_DB_ALIAS
 
 
-def db_table_exists(table_name):
-    with _db_cursor() as c:
-        table_names = connection.introspection.table_names(c)
-        return table_name in table_names
+class _IntrospectionCache(threading.local):
+    """Per-thread store of introspection results, filled inside `cached_introspection`."""
 
+    def __init__(self):
+        self.depth = 0
+        self.table_names = {}
+        self.descriptions = {}
 
-def db_table_has_field(table_name, field_name):
-    table = _get_table_description(table_name)
-    return field_name in [field.name for field in table]
+    def clear(self, alias=None):
+        if alias is None:
+            self.table_names.clear()
+            self.descriptions.clear()
+            return
 
+        self.table_names.pop(alias, None)
+        for key in [key for key in self.descriptions if key[0] == alias]:
+            del self.descriptions[key]
 
-def db_field_allows_null(table_name, field_name):
-    table_description = _get_table_description(table_name)
-    for field in table_description:
-        if field.name == field_name:
-            return field.null_ok
-    raise FieldDoesNotExist(f"field {field_name} does not exist on table {table_name}")
 
+_introspection_cache = _IntrospectionCache()
 
-def _get_table_description(table_name):
-    with _db_cursor() as c:
-        return connection.introspection.get_table_description(c, table_name)
+# Dynamic models are rebuilt as new classes rather than altered in place, so entries
+# never go stale and are dropped along with the class they belong to.
+_model_fields = WeakKeyDictionary()
 
 
 @contextmanager
-def _db_cursor():
-    cursor = connection.cursor()
-    yield cursor
-    cursor.close()
+def cached_introspection():
+    """
+    Memoize table names and descriptions for the duration of the block, e.g. while
+    validating many fields in one request. Schema changes clear the cache.
+    """
+    _introspection_cache.depth += 1
+    try:
+        yield
+    finally:
+        _introspection_cache.depth -= 1
+        if not _introspection_cache.depth:
+            _introspection_cache.clear()
+
+
+def clear_introspection_cache(alias=None):
+    _introspection_cache.clear(alias)
+
+
+@contextmanager
+def with_connection(alias=DEFAULT_DB_ALIAS):
+    """
+    Yield the connection for `alias`, established once for the whole block so that
+    introspection and DDL share it. A connection left unusable by an error is closed,
+    as `close_old_connections` would, rather than being reused by the next request.
+    """
+    conn = connections[alias]
+    conn.ensure_connection()
+    try:
+        yield conn
+    except Exception:
+        if not conn.in_atomic_block:
+            conn.close_if_unusable_or_obsolete()
+        raise
+
+
+def db_table_exists(table_name, using=DEFAULT_DB_ALIAS):
+    return table_name in _get_table_names(using)
+
+
+def db_table_has_field(table_name, field_name, using=DEFAULT_DB_ALIAS):
+    return any(field.name == field_name for field in _get_table_description(table_name, using))
+
+
+def db_field_allows_null(table_name, field_name, using=DEFAULT_DB_ALIAS):
+    table_description = _get_table_description(table_name, using)
+    field = next((field for field in table_description if field.name == field_name), None)
+    if field is None:
+        raise FieldDoesNotExist(f"field {field_name} does not exist on table {table_name}")
+    return field.null_ok
+
+
+def introspect_tables(table_names, using=DEFAULT_DB_ALIAS):
+    """Return a `{table_name: description}` mapping, fetched through a single cursor."""
+    cache = _introspection_cache
+    descriptions = {name: cache.descriptions.get((using, name)) for name in table_names}
+    missing = [name for name, description in descriptions.items() if description is None]
+    if missing:
+        with _db_cursor(using) as (conn, c):
+            for name in missing:
+                descriptions[name] = conn.introspection.get_table_description(c, name)
+        if cache.depth:
+            for name in missing:
+                cache.descriptions[(using, name)] = descriptions[name]
+    return descriptions
+
+
+def _get_table_names(using):
+    cache = _introspection_cache
+    table_names = cache.table_names.get(using)
+    if table_names is None:
+        with _db_cursor(using) as (conn, c):
+            table_names = set(conn.introspection.table_names(c))
+        if cache.depth:
+            cache.table_names[using] = table_names
+    return table_names
+
+
+def _get_table_description(table_name, using):
+    return introspect_tables([table_name], using)[table_name]
+
+
+@contextmanager
+def _db_cursor(using):
+    with with_connection(using) as conn, conn.cursor() as cursor:
+        yield conn, cursor
+
+
+def get_model_field(model, field_name):
+    """Return the forward field `field_name` of `model`, or None if there is none."""
+    try:
+        fields = _model_fields[model]
+    except KeyError:
+        opts = model._meta
+        fields = _model_fields[model] = {
+            field.name: field
+            for field in chain(opts.fields, opts.many_to_many, opts.private_fields)
+        }
+    return fields.get(field_name)
+
+
+def model_is_current(model):
+    """Whether `model` and every model it relates to are still the registered classes."""
+    related_models = (
+        field.related_model
+        for field in chain(model._meta.fields, model._meta.many_to_many)
+        if field.is_relation
+    )
+    return all(
+        not isinstance(related_model, str) and _registered_model(related_model) is related_model
+        for related_model in chain((model,), related_models)
+    )
+
+
+def _registered_model(model):
+    return apps.all_models[model._meta.app_label].get(model._meta.model_name)
 
 
 class ModelRegistry:
+    __slots__ = ("app_label", "_app_models")
+
     def __init__(self, app_label):
+        apps.check_apps_ready()
         self.app_label = app_label
+        self._app_models = apps.all_models[app_label]
 
     def is_registered(self, model_name):
-        return model_name.lower() in apps.all_models[self.app_label]
+        return model_name.lower() in self._app_models
 
     def get_model(self, model_name):
-        try:
-            return apps.get_model(self.app_label, model_name)
-        except LookupError:
-            return None
+        return self._app_models.get(model_name.lower())
 
     def unregister_model(self, model_name):
         try:
-            del apps.all_models[self.app_label][model_name.lower()]
+            del self._app_models[model_name.lower()]
         except KeyError as err:
             raise LookupError("'{}' not found.".format(model_name)) from err
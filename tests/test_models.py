@@ -1,10 +1,14 @@
+import functools
+
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils import timezone
 
 import pytest
 
 from dynamic_models import utils
 from dynamic_models.exceptions import InvalidFieldNameError, NullFieldChangedError
-from dynamic_models.models import FieldSchema
+from dynamic_models.models import FieldKwargsJSON, FieldSchema, ModelSchema
 
 
 class TestModelSchema:
@@ -45,6 +49,12 @@ class TestModelSchema:
         model_schema.delete()
         assert not model_registry.is_registered(model_schema.model_name)
 
+    def test_names_follow_unsaved_rename(self, model_schema):
+        assert model_schema.db_table == "dynamic_models_simple_model"
+        model_schema.name = "new name"
+        assert model_schema.model_name == "NewName"
+        assert model_schema.db_table == "dynamic_models_new_name"
+
     def test_add_field_creates_column(self, model_schema):
         field_schema = FieldSchema(
             name="special",
@@ -57,6 +67,30 @@ class TestModelSchema:
         field_schema.save()
         assert utils.db_table_has_field(table_name, column_name)
 
+    def test_bulk_create_fields_creates_columns(self, model_schema):
+        fields = FieldSchema.bulk_create_with_schema(
+            [
+                FieldSchema(name=name, class_name="django.db.models.IntegerField", null=True)
+                for name in ("first", "second")
+            ],
+            model_schema,
+        )
+        assert model_schema.fields.count() == 2
+        for field in fields:
+            assert utils.db_table_has_field(model_schema.db_table, field.db_column)
+        assert model_schema.as_model().objects.create(first=1, second=2)
+
+    def test_bulk_create_fields_validates_before_insert(self, model_schema):
+        with pytest.raises(InvalidFieldNameError):
+            FieldSchema.bulk_create_with_schema(
+                [
+                    FieldSchema(name="valid", class_name="django.db.models.IntegerField"),
+                    FieldSchema(name="__module__", class_name="django.db.models.IntegerField"),
+                ],
+                model_schema,
+            )
+        assert not model_schema.fields.exists()
+
     def test_update_field_updates_column(self, model_schema, field_schema):
         table_name = model_schema.db_table
         column_name = field_schema.db_column
@@ -83,6 +117,49 @@ class TestFieldSchema:
                 model_schema=model_schema,
             )
 
+    def test_db_column_follows_unsaved_rename(self, field_schema):
+        assert field_schema.db_column == "field"
+        field_schema.name = "new field"
+        assert field_schema.db_column == "new_field"
+
+    def test_loading_fields_does_not_query_model_schema(
+        self, model_schema, django_assert_num_queries
+    ):
+        for name in ("first", "second", "third"):
+            FieldSchema.objects.create(
+                name=name, class_name="django.db.models.IntegerField", model_schema=model_schema
+            )
+        with django_assert_num_queries(1):
+            fields = list(FieldSchema.objects.with_model_schema())
+            assert all(field.model_schema.db_name == model_schema.db_name for field in fields)
+
+    def test_related_fields_do_not_join_model_schema(self, model_schema):
+        assert "JOIN" not in str(model_schema.fields.all().query)
+
+    def test_bulk_init_resolves_registered_fields(self, model_schema, field_schema):
+        fields = FieldSchema.bulk_init(list(model_schema.fields.all()), model_schema)
+        registered_model = model_schema.get_registered_model()
+        assert fields[0].model_schema is model_schema
+        assert fields[0]._initial_field is registered_model._meta.get_field(field_schema.name)
+
+    def test_unchanged_save_skips_schema_changes(self, field_schema, django_assert_num_queries):
+        field_schema = FieldSchema.objects.get(pk=field_schema.pk)
+        # compare kwargs with the stored row, write it, bump the schema version
+        with django_assert_num_queries(3):
+            field_schema.save()
+
+    def test_nested_kwargs_change_is_saved_to_schema(self, model_schema):
+        field_schema = FieldSchema.objects.create(
+            name="field",
+            class_name="django.db.models.CharField",
+            model_schema=model_schema,
+            kwargs={"max_length": 10, "choices": [["a", "A"]]},
+        )
+        field_schema.kwargs["choices"].append(["b", "B"])
+        field_schema.save()
+        field = model_schema.as_model()._meta.get_field("field")
+        assert [tuple(choice) for choice in field.choices] == [("a", "A"), ("b", "B")]
+
     def test_cannot_change_null_to_not_null(self, model_schema):
         null_field = FieldSchema.objects.create(
             name="field",
@@ -95,6 +172,51 @@ class TestFieldSchema:
             null_field.save()
 
 
+class OnDeleteDefaults:
+    @staticmethod
+    def sentinel():
+        return None
+
+
+class TestFieldKwargsJSON:
+    @pytest.mark.parametrize(
+        "on_delete", [models.CASCADE, models.PROTECT, models.SET_NULL, models.DO_NOTHING]
+    )
+    def test_on_delete_round_trip(self, on_delete):
+        field = FieldKwargsJSON()
+        prep_value = field._convert_on_delete_to_string({"on_delete": on_delete})
+        assert prep_value == {"on_delete": on_delete.__name__}
+        assert field.to_python(prep_value) == {"on_delete": on_delete}
+
+    def test_conversion_does_not_mutate_value(self):
+        value = {"on_delete": models.CASCADE}
+        FieldKwargsJSON().get_prep_value(value)
+        assert value == {"on_delete": models.CASCADE}
+
+    def test_set_on_delete_round_trip(self):
+        field = FieldKwargsJSON()
+        prep_value = field._convert_on_delete_to_string({"on_delete": models.SET(timezone.now)})
+        assert prep_value == {"on_delete": "SET:django.utils.timezone.now"}
+        on_delete = field.to_python(prep_value)["on_delete"]
+        assert on_delete.deconstruct() == ("django.db.models.SET", (timezone.now,), {})
+
+    @pytest.mark.parametrize(
+        "value",
+        [1, lambda: None, functools.partial(timezone.now)],
+    )
+    def test_set_on_delete_requires_importable_callable(self, value):
+        with pytest.raises(ValidationError):
+            FieldKwargsJSON().get_prep_value({"on_delete": models.SET(value)})
+
+    def test_set_on_delete_rejects_nested_callable(self):
+        with pytest.raises(ValidationError):
+            FieldKwargsJSON().get_prep_value({"on_delete": models.SET(OnDeleteDefaults.sentinel)})
+
+    def test_invalid_on_delete_raises_validation_error(self):
+        with pytest.raises(ValidationError):
+            FieldKwargsJSON().to_python({"on_delete": "NOT_A_RULE"})
+
+
 @pytest.fixture
 def dynamic_model(model_schema, field_schema):
     return model_schema.as_model()
@@ -165,6 +287,50 @@ class TestDynamicModels:
         assert model_instance.many_related.first() == related_model_instance
         assert related_model_instance.related_objects.first() == model_instance
 
+    def test_as_model_is_reused_until_schema_changes(self, model_schema, another_model_schema):
+        model = model_schema.as_model()
+        assert model_schema.as_model() is model
+        FieldSchema.objects.create(
+            name="related",
+            model_schema=model_schema,
+            class_name="django.db.models.ForeignKey",
+            kwargs={"to": another_model_schema.model_name, "on_delete": models.CASCADE},
+        )
+        model_with_field = model_schema.as_model()
+        assert model_with_field is not model
+        assert model_schema.as_model() is model_with_field
+
+        # regenerating a related model invalidates models pointing to it
+        another_model_schema.save()
+        assert model_schema.as_model() is not model_with_field
+
+    def test_as_model_is_shared_between_schema_instances(self, model_schema):
+        model = model_schema.as_model()
+        same_schema = ModelSchema.objects.get(pk=model_schema.pk)
+        assert same_schema.as_model() is model
+
+        FieldSchema.objects.create(
+            name="field", class_name="django.db.models.IntegerField", model_schema=same_schema
+        )
+        reloaded_schema = ModelSchema.objects.get(pk=model_schema.pk)
+        assert reloaded_schema.updated_at > model_schema.updated_at
+        assert reloaded_schema.as_model()._meta.get_field("field")
+
+    def test_deleting_field_expires_shared_model(self, model_schema, field_schema):
+        same_schema = ModelSchema.objects.get(pk=model_schema.pk)
+        assert same_schema.as_model()._meta.get_field("field")
+        FieldSchema.objects.get(pk=field_schema.pk).delete()
+        model = same_schema.as_model()
+        assert utils.get_model_field(model, "field") is None
+        assert model.objects.create()
+
+    def test_queryset_delete_expires_shared_model(self, model_schema, field_schema):
+        assert model_schema.as_model()._meta.get_field("field")
+        model_schema.fields.all().delete()
+        reloaded_schema = ModelSchema.objects.get(pk=model_schema.pk)
+        assert utils.get_model_field(reloaded_schema.as_model(), "field") is None
+        assert utils.get_model_field(model_schema.as_model(), "field") is None
+
     def test_model_instances_pass_isinstance_check_across_model_generations(self, model_schema):
         model = model_schema.as_model()
         instance = model.objects.create()
@@ -123,6 +123,16 @@ class TestFieldSchemaEditor:
         assert db_table_has_field("tests_initialmodel", "changed")
         assert not db_table_has_field("tests_initialmodel", "integer")
 
+    @pytest.mark.usefixtures("bare_table")
+    def test_batch_update_columns(self, generate_model):
+        model = generate_model(
+            "InitialModel", integer=models.IntegerField(), other=models.IntegerField()
+        )
+        changes = [(None, model._meta.get_field(name)) for name in ("integer", "other")]
+        FieldSchemaEditor().batch_update_columns(model, changes)
+        assert db_table_has_field("tests_initialmodel", "integer")
+        assert db_table_has_field("tests_initialmodel", "other")
+
     @pytest.mark.usefixtures("initial_field_table")
     def test_drop_column(self, initial_model):
         field = initial_model._meta.get_field("integer")
@@ -1,5 +1,11 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+
 import pytest
 
+from dynamic_models import utils
+from dynamic_models.factory import ModelFactory
+
 
 def test_get_model(model_schema, model_registry):
     registered_model = model_registry.get_model(model_schema.model_name)
@@ -23,3 +29,47 @@ def test_unregistering_missing_model_raises_error(model_schema, model_registry):
     model_registry.unregister_model(model_schema.model_name)
     with pytest.raises(LookupError):
         model_registry.unregister_model(model_schema.model_name)
+
+
+def test_get_model_returns_rebuilt_model(model_schema, model_registry):
+    old_model = model_registry.get_model(model_schema.model_name)
+    new_model = ModelFactory(model_schema).get_model()
+    assert old_model is not new_model
+    assert model_registry.get_model(model_schema.model_name) is new_model
+
+
+def test_get_model_finds_models_registered_after_a_miss(model_registry):
+    assert model_registry.get_model("Unmanaged") is None
+    model = type("Unmanaged", (models.Model,), {"__module__": "dynamic_models.models"})
+    assert model_registry.get_model("Unmanaged") is model
+    assert model_registry.is_registered("Unmanaged")
+
+
+def test_cached_introspection_reuses_results(model_schema, django_assert_num_queries):
+    table_name = model_schema.db_table
+    with utils.cached_introspection():
+        assert utils.db_table_exists(table_name)
+        assert utils.db_table_has_field(table_name, "id")
+        with django_assert_num_queries(0):
+            assert utils.db_table_exists(table_name)
+            assert utils.db_table_has_field(table_name, "id")
+            assert utils.introspect_tables([table_name])[table_name]
+
+
+def test_schema_changes_clear_cached_introspection(model_schema):
+    table_name = model_schema.db_table
+    with utils.cached_introspection():
+        assert utils.db_table_exists(table_name)
+        model_schema.delete()
+        assert not utils.db_table_exists(table_name)
+
+
+def test_db_field_allows_null_raises_for_missing_field(model_schema):
+    with pytest.raises(FieldDoesNotExist):
+        utils.db_field_allows_null(model_schema.db_table, "missing")
+
+
+def test_get_model_field(model_schema, field_schema):
+    model = model_schema.as_model()
+    assert utils.get_model_field(model, "field") is model._meta.get_field("field")
+    assert utils.get_model_field(model, "missing") is None